@@ -1,55 +1,159 @@
 import json
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import ClientError, WaiterError
+from botocore.waiter import WaiterModel, create_waiter_with_client
 import logging
 import time
-import subprocess
 import os
-import tempfile
-import shutil
 import re
-import urllib.request
-import urllib.error
-import zipfile
-import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - it is not part of the Lambda Python runtime
+    orjson = None
+
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+
+# Fall back to INFO when LOG_LEVEL is not a recognised level name
+_log_level = logging.getLevelName(os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger.setLevel(_log_level if isinstance(_log_level, int) else logging.INFO)
+
+def dumps_response_body(obj):
+    """Serialize an action response body to a JSON string (uses orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+def dumps_for_log(obj):
+    """Pretty-print an object as JSON for debug logging (uses orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+# Create all clients once per container from a shared session
+_session = boto3.session.Session()
+
+# Region the function and its clients run in, resolved once per container
+AWS_REGION = os.environ.get('AWS_REGION') or _session.region_name
+
+# Keep sockets alive across warm invocations, allow concurrent calls without
+# waiting on the default 10-connection pool, and back off adaptively when throttled
+_client_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=3,
+    read_timeout=30,
+    retries={'mode': 'adaptive', 'max_attempts': 5}
+)
 
 # Use codeconnections_client (newer service) from backup
-sagemaker_client = boto3.client('sagemaker')
-codeconnections_client = boto3.client('codeconnections')
-servicecatalog_client = boto3.client('servicecatalog')
-logs_client = boto3.client('logs')
+sagemaker_client = _session.client('sagemaker', config=_client_config)
+codeconnections_client = _session.client('codeconnections', config=_client_config)
+servicecatalog_client = _session.client('servicecatalog', config=_client_config)
+logs_client = _session.client('logs', config=_client_config)
+s3_client = _session.client('s3', config=_client_config)
+sts_client = _session.client('sts', config=_client_config)
+
+@lru_cache(maxsize=8)
+def get_codepipeline_client(region):
+    """Return the CodePipeline client for a region, created once per container"""
+    return _session.client('codepipeline', region_name=region, config=_client_config)
+
+# STS caller identity, looked up on first use and reused for the container lifetime
+_caller_identity = None
+
+def get_caller_identity():
+    """Return the STS caller identity, calling STS only once per container"""
+    global _caller_identity
+    if _caller_identity is None:
+        _caller_identity = sts_client.get_caller_identity()
+    return _caller_identity
+
+def get_account_id():
+    """Return the AWS account ID"""
+    return get_caller_identity()['Account']
+
+# Project name -> (project_id, project_arn, expires_at); IDs never change for a live project,
+# the TTL only bounds staleness if a project is deleted and recreated under the same name
+PROJECT_ID_CACHE_TTL_SECONDS = 300
+_project_id_cache = {}
+
+def get_project_ids(project_name):
+    """Return (project_id, project_arn) for a SageMaker project, cached per container"""
+    cached = _project_id_cache.get(project_name)
+    if cached and cached[2] > time.monotonic():
+        return cached[0], cached[1]
+    
+    response = sagemaker_client.describe_project(ProjectName=project_name)
+    remember_project_ids(project_name, response['ProjectId'], response['ProjectArn'])
+    return response['ProjectId'], response['ProjectArn']
+
+def remember_project_ids(project_name, project_id, project_arn):
+    """Cache the IDs of a project this container created or described"""
+    _project_id_cache[project_name] = (project_id, project_arn, time.monotonic() + PROJECT_ID_CACHE_TTL_SECONDS)
+
+# Tag applied to every resource the agent creates
+STANDARD_TAGS = [{'Key': 'CreatedBy', 'Value': 'MLOpsAgent'}]
+
+# Name prefixes of MLOps-related log groups; CloudWatch filters on these server-side
+MLOPS_LOG_GROUP_PREFIXES = (
+    '/aws/codebuild/sagemaker-mlops-',
+    '/aws/lambda/sagemaker-p',
+    '/aws/sagemaker/mlflow/',
+    '/aws/sagemaker/Endpoints/',
+    '/aws/sagemaker/ProcessingJobs',
+    '/aws/sagemaker/TrainingJobs'
+)
+
+# Log group tagging runs once per container, on the first (cold) invocation
+_log_groups_tagging_done = False
+
+def iter_log_groups(prefixes):
+    """Yield log groups matching any of the prefixes, streaming page by page"""
+    paginator = logs_client.get_paginator('describe_log_groups')
+    
+    for prefix in prefixes:
+        for page in paginator.paginate(logGroupNamePrefix=prefix):
+            yield from page['logGroups']
 
 def tag_mlops_log_groups():
     """Tag all MLOps-related log groups with CreatedBy: MLOpsAgent"""
     try:
-        patterns = [
-            '/aws/codebuild/sagemaker-mlops-',
-            '/aws/lambda/sagemaker-p',
-            '/aws/sagemaker/mlflow/',
-            '/aws/sagemaker/Endpoints/',
-            '/aws/sagemaker/ProcessingJobs',
-            '/aws/sagemaker/TrainingJobs'
-        ]
-        
-        paginator = logs_client.get_paginator('describe_log_groups')
+        log_group_arns = []
+        for log_group in iter_log_groups(MLOPS_LOG_GROUP_PREFIXES):
+            # logGroupArn is the ARN without the trailing ':*' that TagResource expects
+            log_group_arns.append(log_group.get('logGroupArn') or log_group['arn'].removesuffix(':*'))
         
-        for pattern in patterns:
-            for page in paginator.paginate():
-                for log_group in page['logGroups']:
-                    log_group_name = log_group['logGroupName']
-                    
-                    if pattern in log_group_name:
-                        tag_log_group(log_group_name, {
-                            'CreatedBy': 'MLOpsAgent',
-                            'Purpose': 'MLOpsAutomation'
-                        })
+        tag_log_groups(log_group_arns, {
+            'CreatedBy': 'MLOpsAgent',
+            'Purpose': 'MLOpsAutomation'
+        })
                         
     except Exception as e:
-        logger.warning(f"Could not tag MLOps log groups: {str(e)}")
+        logger.warning("Could not tag MLOps log groups: %s", e)
+
+def tag_log_groups(log_group_arns, tags):
+    """Tag CloudWatch log groups by ARN with CreatedBy and other tags, concurrently"""
+    tags = {**tags, 'CreatedBy': 'MLOpsAgent'}
+    
+    def tag_resource(log_group_arn):
+        try:
+            logs_client.tag_resource(resourceArn=log_group_arn, tags=tags)
+            logger.info("Tagged log group %s", log_group_arn)
+        except Exception as e:
+            logger.warning("Could not tag log group %s: %s", log_group_arn, e)
+    
+    if not log_group_arns:
+        return
+    
+    # Stays well within the client connection pool size
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        list(executor.map(tag_resource, log_group_arns))
 
 def tag_log_group(log_group_name, tags=None):
     """Tag CloudWatch log group with CreatedBy and other tags"""
@@ -63,31 +167,37 @@ def tag_log_group(log_group_name, tags=None):
             logGroupName=log_group_name,
             tags=tags
         )
-        logger.info(f"Tagged log group {log_group_name}")
+        logger.info("Tagged log group %s", log_group_name)
     except Exception as e:
-        logger.warning(f"Could not tag log group {log_group_name}: {str(e)}")
+        logger.warning("Could not tag log group %s: %s", log_group_name, e)
 
 def lambda_handler(event, context):
     """Main handler for MLOps project management actions"""
+    global _log_groups_tagging_done
     
     # Tag the Lambda log group on first execution
-    try:
-        log_group_name = f"/aws/lambda/{context.function_name}"
-        tag_log_group(log_group_name, {
-            'CreatedBy': 'MLOpsAgent',
-            'Purpose': 'MLOpsAutomation'
-        })
-        
-        tag_mlops_log_groups()
-        
-    except Exception as e:
-        logger.warning(f"Could not tag Lambda log group: {str(e)}")
-    
-    logger.info("="*50)
-    logger.info("BEDROCK AGENT EVENT DEBUG")
-    logger.info("="*50)
-    logger.info(f"FULL EVENT RECEIVED: {json.dumps(event, indent=2, default=str)}")
-    logger.info("="*50)
+    if not _log_groups_tagging_done:
+        try:
+            log_group_name = f"/aws/lambda/{context.function_name}"
+            tag_log_group(log_group_name, {
+                'CreatedBy': 'MLOpsAgent',
+                'Purpose': 'MLOpsAutomation'
+            })
+            
+            tag_mlops_log_groups()
+            
+        except Exception as e:
+            logger.warning("Could not tag Lambda log group: %s", e)
+        finally:
+            _log_groups_tagging_done = True
+    
+    # Full event dumps are only serialized when DEBUG logging is enabled (LOG_LEVEL=DEBUG)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("="*50)
+        logger.debug("BEDROCK AGENT EVENT DEBUG")
+        logger.debug("="*50)
+        logger.debug("FULL EVENT RECEIVED: %s", dumps_for_log(event))
+        logger.debug("="*50)
     
     # Extract action and parameters from Bedrock Agent event
     action_group = event.get('actionGroup', '')
@@ -97,45 +207,28 @@ def lambda_handler(event, context):
     # Extract parameters from requestBody
     params = extract_parameters_from_request_body(event)
     
-    logger.info(f"Action Group: {action_group}")
-    logger.info(f"API Path: {api_path}")
-    logger.info(f"HTTP Method: {http_method}")
-    logger.info(f"Extracted Parameters: {params}")
+    logger.info("Action Group: %s", action_group)
+    logger.info("API Path: %s", api_path)
+    logger.info("HTTP Method: %s", http_method)
     
     try:
-        if api_path == '/configure-code-connection':
-            response = create_code_connection(params)  # Use backup version
-        elif api_path == '/create-mlops-project':
-            response = create_mlops_project(params)
-        elif api_path == '/manage-project-lifecycle':
-            response = manage_project_lifecycle(params)
-        elif api_path == '/list-mlops-templates':
-            response = list_mlops_templates(params)
-        elif api_path == '/build-cicd-pipeline':  
-            response = build_cicd_pipeline(params)
-        elif api_path == '/manage-model-approval':  
-            response = manage_model_approval(params)
-        elif api_path == '/manage-staging-approval':  
-            response = manage_staging_approval(params)
-        elif api_path == '/create-feature-store-group':
-            response = create_feature_store_group(params)
-        elif api_path == '/create-mlflow-server':
-            response = create_mlflow_server(params)
-        elif api_path == '/create-model-group':
-            response = create_model_group(params)
+        action_handler = API_ROUTES.get(api_path)
+        if action_handler:
+            response = action_handler(params)
         else:
             response = {
                 'statusCode': 400,
-                'body': f'Unknown API path: {api_path}. Available paths: /configure-code-connection, /create-mlops-project, /manage-project-lifecycle, /list-mlops-templates, /build-cicd-pipeline, /manage-model-approval, /manage-staging-approval, /create-feature-store-group, /create-mlflow-server, /create-model-group'
+                'body': f'Unknown API path: {api_path}. Available paths: {", ".join(API_ROUTES)}'
             }
     except Exception as e:
-        logger.error(f"Error executing action: {str(e)}", exc_info=True)
+        logger.error("Error executing action: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         response = {
             'statusCode': 500,
             'body': f'Error: {str(e)}'
         }
     
-    logger.info(f"Response: {json.dumps(response, indent=2, default=str)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response: %s", dumps_for_log(response))
     
     return {
         'messageVersion': '1.0',
@@ -146,67 +239,60 @@ def lambda_handler(event, context):
             'httpStatusCode': response.get('statusCode', 200),
             'responseBody': {
                 'application/json': {
-                    'body': json.dumps(response.get('body', response))
+                    'body': dumps_response_body(response.get('body', response))
                 }
             }
         }
     }
 
+def iter_named_values(items):
+    """Yield (name, value) pairs from a Bedrock Agent parameters or properties list"""
+    for item in items:
+        if isinstance(item, dict) and 'name' in item and 'value' in item:
+            yield item['name'], item['value']
+
 def extract_parameters_from_request_body(event):
     """Extract parameters from Bedrock Agent event (handles both requestBody and parameters array)"""
     params = {}
     
     try:
-        logger.info("Starting parameter extraction...")
-        logger.info(f"Event keys: {list(event.keys())}")
+        logger.debug("Event keys: %s", list(event))
         
         # METHOD 1: Check parameters array (THIS IS WHERE BEDROCK SENDS THEM!)
-        if 'parameters' in event and isinstance(event['parameters'], list):
-            parameters_array = event['parameters']
-            logger.info(f"Found parameters array with {len(parameters_array)} items")
-            
-            for param in parameters_array:
-                if isinstance(param, dict) and 'name' in param and 'value' in param:
-                    params[param['name']] = param['value']
-                    logger.info(f"Extracted parameter: {param['name']} = {param['value']}")
+        params.update(iter_named_values(event.get('parameters') or ()))
         
-        # METHOD 2: Check requestBody (fallback for other formats)
+        # METHOD 2: Check requestBody (fallback for other formats; never overwrites parameters array values)
         request_body = event.get('requestBody')
         if request_body:
-            logger.info(f"RequestBody also exists: {json.dumps(request_body, indent=2, default=str)}")
-            
-            content = request_body.get('content', {})
-            application_json = content.get('application/json', {})
-            properties = application_json.get('properties', [])
-            
-            logger.info(f"Properties in requestBody: {len(properties)}")
-            
-            # Convert properties array to dictionary
-            for prop in properties:
-                if isinstance(prop, dict) and 'name' in prop and 'value' in prop:
-                    # Don't overwrite parameters array values
-                    if prop['name'] not in params:
-                        params[prop['name']] = prop['value']
-                        logger.info(f"Extracted from requestBody: {prop['name']} = {prop['value']}")
-        else:
-            logger.info("No requestBody found in event (using parameters array)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("RequestBody also exists: %s", dumps_for_log(request_body))
             
+            properties = request_body.get('content', {}).get('application/json', {}).get('properties', [])
+            for name, value in iter_named_values(properties):
+                params.setdefault(name, value)
+        
         # METHOD 3: Check for query string parameters (additional fallback)
-        if 'queryStringParameters' in event and event['queryStringParameters']:
-            logger.info(f"Query parameters: {event['queryStringParameters']}")
-            params.update(event['queryStringParameters'])
+        params.update(event.get('queryStringParameters') or {})
         
-        logger.info(f"Final extracted parameters: {params}")
+        logger.info("Extracted %d parameters: %s", len(params), list(params))
         
     except Exception as e:
-        logger.error(f"Error extracting parameters: {str(e)}", exc_info=True)
+        logger.error("Error extracting parameters: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
     
     return params
 
+CODE_CONNECTION_TAGS = STANDARD_TAGS + [
+    {'Key': 'Purpose', 'Value': 'MLOpsAutomation'},
+    {'Key': 'sagemaker', 'Value': 'true'}
+]
+
+# CreateConnection declares no duplicate-name error code, so fall back to the message
+DUPLICATE_CONNECTION_PATTERN = re.compile('already exists|duplicate', re.IGNORECASE)
+
 # Use create_code_connection from backup (CodeConnections)
 def create_code_connection(params: Dict[str, Any]) -> Dict[str, Any]:
     """Create AWS CodeConnections connection for GitHub integration"""
-    logger.info(f"create_code_connection called with params: {params}")
+    logger.info("create_code_connection called with params: %s", params)
     
     connection_name = params.get('connection_name')
     provider_type = params.get('provider_type', 'GitHub')
@@ -218,33 +304,20 @@ def create_code_connection(params: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     try:
-        logger.info(f"Creating CodeConnections connection: {connection_name} with provider: {provider_type}")
+        logger.info("Creating CodeConnections connection: %s with provider: %s", connection_name, provider_type)
         
         response = codeconnections_client.create_connection(
             ConnectionName=connection_name,
             ProviderType=provider_type,
-            Tags=[
-                {
-                    'Key': 'CreatedBy',
-                    'Value': 'MLOpsAgent'
-                },
-                {
-                    'Key': 'Purpose',
-                    'Value': 'MLOpsAutomation'
-                },
-                {
-                    'Key': 'sagemaker',
-                    'Value': 'true'
-                }
-            ]
+            Tags=CODE_CONNECTION_TAGS
         )
         
-        logger.info(f"CodeConnections response: {json.dumps(response, default=str)}")
+        logger.info("CodeConnections response: %s", response)
         
         connection_arn = response['ConnectionArn']
         connection_status = response.get('ConnectionStatus', 'PENDING')
         
-        logger.info(f"Successfully created connection: {connection_arn}")
+        logger.info("Successfully created connection: %s", connection_arn)
         
         return {
             'statusCode': 200,
@@ -265,11 +338,13 @@ def create_code_connection(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
         
-    except Exception as e:
-        logger.error(f"Error creating connection: {str(e)}", exc_info=True)
+    except ClientError as e:
+        logger.error("Error creating connection: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         
         # Check if it's a duplicate connection error
-        if 'already exists' in str(e).lower() or 'duplicate' in str(e).lower():
+        error = e.response.get('Error', {})
+        if (error.get('Code') in ('ConflictException', 'ResourceAlreadyExistsException')
+                or DUPLICATE_CONNECTION_PATTERN.search(error.get('Message', ''))):
             return {
                 'statusCode': 409,
                 'body': {
@@ -283,47 +358,51 @@ def create_code_connection(params: Dict[str, Any]) -> Dict[str, Any]:
                 'statusCode': 500,
                 'body': f'Failed to create connection: {str(e)}'
             }
+    
+    except Exception as e:
+        logger.error("Error creating connection: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        return {
+            'statusCode': 500,
+            'body': f'Failed to create connection: {str(e)}'
+        }
 
 # Use complex S3 bucket validation from main file
 def ensure_s3_bucket_exists(artifact_store_uri):
     """Ensure S3 bucket exists with comprehensive error handling"""
     bucket_created = False
     bucket_name = None
+    timestamp = int(time.time())
     
     try:
         # Parse S3 URI
-        s3_path = artifact_store_uri.replace('s3://', '')
-        bucket_name = s3_path.split('/')[0]
-        prefix = '/'.join(s3_path.split('/')[1:]) if '/' in s3_path else ''
+        s3_path = artifact_store_uri[5:] if artifact_store_uri.startswith('s3://') else artifact_store_uri
+        bucket_name = s3_path.partition('/')[0]
         
-        logger.info(f"Checking S3 bucket: {bucket_name}")
+        logger.info("Checking S3 bucket: %s", bucket_name)
         
         if not bucket_name:
             return False, "Invalid S3 URI - no bucket name found", None
         
-        s3_client = boto3.client('s3')
-        
         # Check if bucket exists and is accessible
         try:
             response = s3_client.head_bucket(Bucket=bucket_name)
-            logger.info(f"Bucket {bucket_name} exists and is accessible")
+            logger.info("Bucket %s exists and is accessible", bucket_name)
             bucket_created = False
             
-        except Exception as head_error:
-            # Parse the error to determine what to do
-            error_code = None
-            if hasattr(head_error, 'response') and 'Error' in head_error.response:
-                error_code = head_error.response['Error'].get('Code', 'Unknown')
+        except ClientError as head_error:
+            # Classify by AWS error code to determine what to do
+            error_code = head_error.response.get('Error', {}).get('Code', 'Unknown')
+            head_error_message = str(head_error)
             
-            logger.info(f"HeadBucket error code: {error_code}, error: {str(head_error)[:200]}")
+            logger.info("HeadBucket error code: %s, error: %s", error_code, head_error_message[:200])
             
-            if error_code == '404' or 'Not Found' in str(head_error):
+            if error_code in ('404', 'NoSuchBucket'):
                 # Bucket doesn't exist - try to create it
-                logger.info(f"Bucket doesn't exist (404), creating: {bucket_name}")
+                logger.info("Bucket doesn't exist (404), creating: %s", bucket_name)
                 
                 try:
-                    region = os.environ.get('AWS_REGION', 'us-west-2')
-                    logger.info(f"Creating bucket in region: {region}")
+                    region = AWS_REGION
+                    logger.info("Creating bucket in region: %s", region)
                     
                     if region == 'us-east-1':
                         create_response = s3_client.create_bucket(Bucket=bucket_name)
@@ -333,22 +412,22 @@ def ensure_s3_bucket_exists(artifact_store_uri):
                             CreateBucketConfiguration={'LocationConstraint': region}
                         )
                     
-                    logger.info(f"Create bucket response: {str(create_response)[:200]}")
-                    logger.info(f"Successfully created bucket: {bucket_name}")
+                    logger.info("Create bucket response: %s", str(create_response)[:200])
+                    logger.info("Successfully created bucket: %s", bucket_name)
                     bucket_created = True
                     
                     # Wait a moment for bucket to be ready
                     time.sleep(2)
                     
-                except Exception as create_error:
-                    logger.error(f"Failed to create bucket: {str(create_error)[:200]}")
+                except ClientError as create_error:
+                    create_error_message = str(create_error)
+                    logger.error("Failed to create bucket: %s", create_error_message[:200])
                     
                     # Check if it's a naming conflict
-                    if 'BucketAlreadyExists' in str(create_error) or 'already exists' in str(create_error).lower():
+                    if create_error.response.get('Error', {}).get('Code') == 'BucketAlreadyExists':
                         # Suggest alternative bucket names
                         try:
-                            account_id = boto3.client('sts').get_caller_identity()['Account']
-                            timestamp = int(time.time())
+                            account_id = get_account_id()
                             
                             suggested_names = [
                                 f"{bucket_name}-{account_id}",
@@ -357,25 +436,24 @@ def ensure_s3_bucket_exists(artifact_store_uri):
                                 f"sagemaker-mlflow-{account_id}"
                             ]
                             
-                            return False, f"Bucket name conflict: {create_error}", {
+                            return False, f"Bucket name conflict: {create_error_message}", {
                                 'original_bucket': bucket_name,
-                                'error': str(create_error),
+                                'error': create_error_message,
                                 'suggested_names': suggested_names,
                                 'account_id': account_id
                             }
                         except Exception as sts_error:
-                            logger.error(f"Error getting account ID: {sts_error}")
-                            return False, f"Bucket creation failed: {create_error}", None
+                            logger.error("Error getting account ID: %s", sts_error)
+                            return False, f"Bucket creation failed: {create_error_message}", None
                     else:
-                        return False, f"Bucket creation failed: {create_error}", None
+                        return False, f"Bucket creation failed: {create_error_message}", None
                         
-            elif error_code == '403' or 'Forbidden' in str(head_error):
+            elif error_code in ('403', 'AccessDenied'):
                 # Bucket exists but belongs to another account
-                logger.error(f"Bucket {bucket_name} exists but is owned by another account")
+                logger.error("Bucket %s exists but is owned by another account", bucket_name)
                 
                 try:
-                    account_id = boto3.client('sts').get_caller_identity()['Account']
-                    timestamp = int(time.time())
+                    account_id = get_account_id()
                     
                     suggested_names = [
                         f"{bucket_name}-{account_id}",
@@ -391,52 +469,19 @@ def ensure_s3_bucket_exists(artifact_store_uri):
                         'account_id': account_id
                     }
                 except Exception as sts_error:
-                    logger.error(f"Error getting account ID: {sts_error}")
-                    return False, f"Bucket access forbidden: {head_error}", None
+                    logger.error("Error getting account ID: %s", sts_error)
+                    return False, f"Bucket access forbidden: {head_error_message}", None
             else:
                 # Other error - return it
-                logger.error(f"Unexpected bucket access error: {str(head_error)[:200]}")
-                return False, f"Bucket access error: {head_error}", None
+                logger.error("Unexpected bucket access error: %s", head_error_message[:200])
+                return False, f"Bucket access error: {head_error_message}", None
         
         # If we get here, bucket exists or was created successfully
-        logger.info(f"Proceeding with bucket setup for: {bucket_name}")
+        logger.info("Proceeding with bucket setup for: %s", bucket_name)
         
-        # Create prefix/folder structure if specified
-        if prefix:
-            try:
-                logger.info(f"Creating folder structure: {prefix}")
-                folder_key = prefix.rstrip('/') + '/'
-                s3_client.put_object(
-                    Bucket=bucket_name,
-                    Key=folder_key,
-                    Body=b'',
-                    Metadata={'CreatedBy': 'MLOpsAgent', 'Purpose': 'MLflowArtifacts'}
-                )
-                logger.info(f"Successfully created folder structure: {folder_key}")
-            except Exception as folder_error:
-                logger.warning(f"Could not create folder structure: {str(folder_error)[:200]}")
-                # Don't fail for folder creation issues
-        
-        # Test write access
-        try:
-            logger.info("Testing S3 write access...")
-            test_key = f"{prefix}/mlflow-test-{int(time.time())}.txt" if prefix else f"mlflow-test-{int(time.time())}.txt"
-            
-            s3_client.put_object(
-                Bucket=bucket_name,
-                Key=test_key,
-                Body=b'MLflow server access test',
-                Metadata={'CreatedBy': 'MLOpsAgent'}
-            )
-            logger.info(f"Write test successful: {test_key}")
-            
-            # Clean up test file
-            s3_client.delete_object(Bucket=bucket_name, Key=test_key)
-            logger.info(f"Test file cleanup successful")
-            
-        except Exception as write_error:
-            logger.error(f"S3 write test failed: {str(write_error)[:200]}")
-            return False, f"S3 write access failed: {write_error}", bucket_name
+        # No folder marker for the prefix: S3 prefixes exist implicitly once MLflow writes artifacts.
+        # No separate write probe either: HeadBucket covers existence/ownership and
+        # MLflow's own artifact writes surface any permission problems
         
         bucket_status = "created" if bucket_created else "existing"
         success_message = f"S3 bucket ready ({bucket_status}): s3://{bucket_name}"
@@ -445,12 +490,59 @@ def ensure_s3_bucket_exists(artifact_store_uri):
         return True, success_message, bucket_name
         
     except Exception as e:
-        logger.error(f"S3 bucket setup failed with unexpected error: {str(e)[:200]}", exc_info=True)
+        logger.error("S3 bucket setup failed with unexpected error: %s", str(e)[:200], exc_info=logger.isEnabledFor(logging.DEBUG))
         return False, f"S3 setup error: {e}", bucket_name
 
+def get_latest_provisioning_artifact_id(product_id):
+    """Return the ID of the latest active provisioning artifact of a Service Catalog product, or None"""
+    artifacts_response = servicecatalog_client.list_provisioning_artifacts(
+        ProductId=product_id
+    )
+    artifacts = artifacts_response.get('ProvisioningArtifactDetails', [])
+    
+    # Single pass for the newest active artifact; ">=" keeps the later entry on ties, as before
+    latest_artifact = None
+    for artifact in artifacts:
+        if artifact.get('Active', True) and (
+            latest_artifact is None or artifact['CreationTime'] >= latest_artifact['CreationTime']
+        ):
+            latest_artifact = artifact
+    return latest_artifact['Id'] if latest_artifact else None
+
+def find_provisionable_product(products, is_match):
+    """Return (product_id, provisioning_artifact_id) of the first matching product that has an active artifact"""
+    for product in products:
+        if not is_match(product['Name']):
+            continue
+        
+        provisioning_artifact_id = get_latest_provisioning_artifact_id(product['ProductId'])
+        if provisioning_artifact_id:
+            logger.info("Found matching product: %s (ID: %s)", product['Name'], product['ProductId'])
+            return product['ProductId'], provisioning_artifact_id
+    
+    return None, None
+
+# Discovered (product_id, provisioning_artifact_id, expires_at) per region; the TTL lets long-lived
+# containers pick up a newly published template version
+SERVICE_CATALOG_CACHE_TTL_SECONDS = 3600
+_service_catalog_product_cache = {}
+
 # Use dynamic Service Catalog product discovery from backup
 def find_mlops_service_catalog_product():
     """Dynamically discover MLOps Service Catalog template"""
+    # Operators who know the template IDs can skip discovery entirely
+    env_product_id = os.environ.get('MLOPS_PRODUCT_ID')
+    env_artifact_id = os.environ.get('MLOPS_ARTIFACT_ID')
+    if env_product_id and env_artifact_id:
+        logger.info("Using MLOps template from environment - Product ID: %s, Artifact ID: %s", env_product_id, env_artifact_id)
+        return env_product_id, env_artifact_id
+    
+    region = AWS_REGION
+    cached_product = _service_catalog_product_cache.get(region)
+    if cached_product and cached_product[2] > time.monotonic():
+        logger.info("Using cached MLOps template for region %s: %s", region, cached_product[:2])
+        return cached_product[:2]
+    
     try:
         logger.info("Searching for MLOps Service Catalog template...")
         
@@ -463,69 +555,91 @@ def find_mlops_service_catalog_product():
             }
         )
         
-        logger.info(f"Search returned {len(search_response.get('ProductViewSummaries', []))} products")
+        logger.info("Search returned %s products", len(search_response.get('ProductViewSummaries', [])))
         
-        product_id = None
-        provisioning_artifact_id = None
-        
-        for product in search_response.get('ProductViewSummaries', []):
-            if product['Name'] == target_template_name:
-                product_id = product['ProductId']
-                
-                # Get the latest provisioning artifact
-                artifacts_response = servicecatalog_client.list_provisioning_artifacts(
-                    ProductId=product_id
-                )
-                artifacts = artifacts_response.get('ProvisioningArtifactDetails', [])
-                if artifacts:
-                    # Use the latest provisioning artifact (last in list)
-                    active_artifacts = [a for a in artifacts if a.get('Active', True)]
-                    if active_artifacts:
-                        provisioning_artifact_id = active_artifacts[-1]['Id']
-                        break
+        product_id, provisioning_artifact_id = find_provisionable_product(
+            search_response.get('ProductViewSummaries', []),
+            lambda name: name == target_template_name
+        )
         
         # Add fallback search if exact match fails
         if not product_id:
             logger.info("Exact match failed, trying broader search terms...")
             fallback_terms = ["MLOps", "SageMaker", "model building"]
             
-            for term in fallback_terms:
-                logger.info(f"Searching with fallback term: {term}")
-                search_response = servicecatalog_client.search_products(
-                    Filters={'FullTextSearch': [term]}
-                )
-                
-                # Look for products containing key MLOps terms
-                for product in search_response.get('ProductViewSummaries', []):
-                    if ('mlops' in product['Name'].lower() and 
-                        ('git' in product['Name'].lower() or 'codepipeline' in product['Name'].lower())):
-                        
-                        product_id = product['ProductId']
-                        logger.info(f"Found matching product via fallback: {product['Name']} (ID: {product_id})")
-                        
-                        # Get the latest provisioning artifact
-                        artifacts_response = servicecatalog_client.list_provisioning_artifacts(
-                            ProductId=product_id
-                        )
-                        artifacts = artifacts_response.get('ProvisioningArtifactDetails', [])
-                        if artifacts:
-                            active_artifacts = [a for a in artifacts if a.get('Active', True)]
-                            if active_artifacts:
-                                provisioning_artifact_id = active_artifacts[-1]['Id']
-                                break
+            # Look for products containing key MLOps terms
+            def is_mlops_git_product(name):
+                name = name.lower()
+                return 'mlops' in name and ('git' in name or 'codepipeline' in name)
+            
+            # Run all fallback searches concurrently, then check them in priority order
+            with ThreadPoolExecutor(max_workers=len(fallback_terms)) as executor:
+                search_futures = [
+                    executor.submit(servicecatalog_client.search_products, Filters={'FullTextSearch': [term]})
+                    for term in fallback_terms
+                ]
                 
-                if product_id:
-                    break
+                for term, search_future in zip(fallback_terms, search_futures):
+                    logger.info("Searching with fallback term: %s", term)
+                    product_id, provisioning_artifact_id = find_provisionable_product(
+                        search_future.result().get('ProductViewSummaries', []),
+                        is_mlops_git_product
+                    )
+                    
+                    if product_id:
+                        break
+        
+        if product_id and provisioning_artifact_id:
+            _service_catalog_product_cache[region] = (
+                product_id,
+                provisioning_artifact_id,
+                time.monotonic() + SERVICE_CATALOG_CACHE_TTL_SECONDS
+            )
         
         return product_id, provisioning_artifact_id
         
     except Exception as e:
-        logger.error(f"Error finding MLOps Service Catalog product: {str(e)}", exc_info=True)
+        logger.error("Error finding MLOps Service Catalog product: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return None, None
 
+MLOPS_PROJECT_REQUIRED_PARAMS = ('project_name', 'github_repo_build', 'github_repo_deploy', 'connection_arn', 'github_username')
+
+# Service Catalog provisioning parameter keys for the MLOps GitHub template, in order
+PROJECT_PROVISIONING_KEYS = (
+    'ModelBuildCodeRepositoryBranch',
+    'ModelBuildCodeRepositoryFullname',
+    'ModelDeployCodeRepositoryBranch',
+    'ModelDeployCodeRepositoryFullname',
+    'CodeConnectionArn'
+)
+
+MLOPS_PROJECT_TAGS = STANDARD_TAGS + [
+    {'Key': 'Environment', 'Value': 'Development'},
+    {'Key': 'GitHubIntegration', 'Value': 'Enabled'}
+]
+
+# SageMaker has no built-in waiter for project creation, so define one on DescribeProject
+project_created_waiter = create_waiter_with_client('ProjectCreated', WaiterModel({
+    'version': 2,
+    'waiters': {
+        'ProjectCreated': {
+            'operation': 'DescribeProject',
+            'delay': 10,
+            'maxAttempts': 60,
+            'acceptors': [
+                {'state': 'success', 'matcher': 'path', 'argument': 'ProjectStatus', 'expected': 'CreateCompleted'},
+                {'state': 'failure', 'matcher': 'path', 'argument': 'ProjectStatus', 'expected': 'CreateFailed'}
+            ]
+        }
+    }
+}), sagemaker_client)
+
+# Case-insensitive match without lowercasing a copy of the whole error message
+ALREADY_EXISTS_PATTERN = re.compile('already exists', re.IGNORECASE)
+
 def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
     """Create MLOps project with GitHub integration and wait for completion"""
-    logger.info(f"create_mlops_project called with params: {params}")
+    logger.info("create_mlops_project called with params: %s", params)
     
     project_name = params.get('project_name')
     github_repo_build = params.get('github_repo_build')
@@ -533,16 +647,10 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
     connection_arn = params.get('connection_arn')
     github_username = params.get('github_username')
     
-    if not all([project_name, github_repo_build, github_repo_deploy, connection_arn, github_username]):
-        missing_params = []
-        if not project_name: missing_params.append('project_name')
-        if not github_repo_build: missing_params.append('github_repo_build')
-        if not github_repo_deploy: missing_params.append('github_repo_deploy')
-        if not connection_arn: missing_params.append('connection_arn')
-        if not github_username: missing_params.append('github_username')
-        
+    missing_params = [key for key in MLOPS_PROJECT_REQUIRED_PARAMS if not params.get(key)]
+    if missing_params:
         error_msg = f'Missing required parameters: {missing_params}. Available params: {list(params.keys())}'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': error_msg
@@ -562,7 +670,7 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                 }
             }
         
-        logger.info(f"Found template - Product ID: {product_id}, Artifact ID: {provisioning_artifact_id}")
+        logger.info("Found template - Product ID: %s, Artifact ID: %s", product_id, provisioning_artifact_id)
         
         # STEP 2: Set GitHub repository names and project parameters
         logger.info("Step 2: Setting up project parameters...")
@@ -575,34 +683,22 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
         model_build_code_repository_full_name = f"{github_username}/{github_repo_build}"
         model_deploy_code_repository_full_name = f"{github_username}/{github_repo_deploy}"
         
-        logger.info(f"Build repo: {model_build_code_repository_full_name}")
-        logger.info(f"Deploy repo: {model_deploy_code_repository_full_name}")
+        logger.info("Build repo: %s", model_build_code_repository_full_name)
+        logger.info("Deploy repo: %s", model_deploy_code_repository_full_name)
         
         # Set project parameters
         project_parameters = [
-            {
-                'Key': 'ModelBuildCodeRepositoryBranch',
-                'Value': model_build_code_repository_branch
-            },
-            {
-                'Key': 'ModelBuildCodeRepositoryFullname',
-                'Value': model_build_code_repository_full_name
-            },
-            {
-                'Key': 'ModelDeployCodeRepositoryBranch',
-                'Value': model_deploy_code_repository_branch
-            },
-            {
-                'Key': 'ModelDeployCodeRepositoryFullname',
-                'Value': model_deploy_code_repository_full_name
-            },
-            {
-                'Key': 'CodeConnectionArn',
-                'Value': connection_arn
-            }
+            {'Key': key, 'Value': value}
+            for key, value in zip(PROJECT_PROVISIONING_KEYS, (
+                model_build_code_repository_branch,
+                model_build_code_repository_full_name,
+                model_deploy_code_repository_branch,
+                model_deploy_code_repository_full_name,
+                connection_arn
+            ))
         ]
         
-        logger.info(f"Project parameters configured: {json.dumps(project_parameters, indent=2)}")
+        logger.info("Project parameters configured: %s", project_parameters)
         
         # STEP 3: Create the SageMaker project
         logger.info("Step 3: Creating SageMaker MLOps project...")
@@ -615,26 +711,14 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                 'ProvisioningArtifactId': provisioning_artifact_id,
                 'ProvisioningParameters': project_parameters
             },
-            Tags=[
-                {
-                    'Key': 'CreatedBy',
-                    'Value': 'MLOpsAgent'
-                },
-                {
-                    'Key': 'Environment',
-                    'Value': 'Development'
-                },
-                {
-                    'Key': 'GitHubIntegration',
-                    'Value': 'Enabled'
-                }
-            ]
+            Tags=MLOPS_PROJECT_TAGS
         )
         
         project_arn = project_response['ProjectArn']
         project_id = project_response['ProjectId']
+        remember_project_ids(project_name, project_id, project_arn)
         
-        logger.info(f"Project creation initiated - ID: {project_id}, ARN: {project_arn}")
+        logger.info("Project creation initiated - ID: %s, ARN: %s", project_id, project_arn)
         
         # STEP 4: Wait for project creation completion (3-5 minutes)
         logger.info("Step 4: Monitoring project creation status...")
@@ -642,52 +726,47 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
         
         max_wait_time = 600  # 10 minutes maximum wait
         wait_interval = 10   # Check every 10 seconds
-        elapsed_time = 0
+        wait_start = time.monotonic()
         
-        while elapsed_time < max_wait_time:
-            try:
-                project_status_response = sagemaker_client.describe_project(ProjectName=project_name)
-                current_status = project_status_response['ProjectStatus']
-                
-                logger.info(f"Current project status: {current_status} (elapsed: {elapsed_time}s)")
-                
-                if current_status == 'CreateCompleted':
-                    logger.info(f"MLOps project {project_name} creation completed successfully!")
-                    break
-                elif current_status == 'CreateFailed':
-                    error_msg = f"Project creation failed with status: {current_status}"
-                    logger.error(error_msg)
-                    return {
-                        'statusCode': 500,
-                        'body': {
-                            'error': 'Project creation failed',
-                            'message': error_msg,
-                            'project_name': project_name,
-                            'project_id': project_id,
-                            'status': current_status
-                        }
+        try:
+            project_created_waiter.wait(
+                ProjectName=project_name,
+                WaiterConfig={'Delay': wait_interval, 'MaxAttempts': max_wait_time // wait_interval}
+            )
+            final_status = 'CreateCompleted'
+            logger.info("MLOps project %s creation completed successfully!", project_name)
+            
+        except WaiterError as wait_error:
+            final_status = (wait_error.last_response or {}).get('ProjectStatus', 'Unknown')
+            logger.info("Stopped waiting for project creation: %s", wait_error)
+            
+            if final_status == 'CreateFailed':
+                error_msg = f"Project creation failed with status: {final_status}"
+                logger.error(error_msg)
+                return {
+                    'statusCode': 500,
+                    'body': {
+                        'error': 'Project creation failed',
+                        'message': error_msg,
+                        'project_name': project_name,
+                        'project_id': project_id,
+                        'status': final_status
                     }
-                else:
-                    # Still in progress, wait and check again
-                    logger.info("Waiting for project creation completion...")
-                    time.sleep(wait_interval)
-                    elapsed_time += wait_interval
-                    
-            except Exception as status_error:
-                logger.error(f"Error checking project status: {status_error}")
-                time.sleep(wait_interval)
-                elapsed_time += wait_interval
+                }
         
-        # Check final status
-        try:
-            final_status_response = sagemaker_client.describe_project(ProjectName=project_name)
-            final_status = final_status_response['ProjectStatus']
-        except Exception as final_check_error:
-            logger.error(f"Error getting final status: {final_check_error}")
-            final_status = 'Unknown'
+        elapsed_time = int(time.monotonic() - wait_start)
+        
+        # Waiter stopped on an API error, so look the status up once more
+        if final_status == 'Unknown':
+            try:
+                final_status_response = sagemaker_client.describe_project(ProjectName=project_name)
+                final_status = final_status_response['ProjectStatus']
+            except Exception as final_check_error:
+                logger.error("Error getting final status: %s", final_check_error)
         
         if final_status != 'CreateCompleted':
-            logger.warning(f"Project creation did not complete within {max_wait_time} seconds. Final status: {final_status}")
+            # The waiter also stops early on an API error, so report the time actually waited
+            logger.warning("Project creation did not complete within %s seconds. Final status: %s", elapsed_time, final_status)
             return {
                 'statusCode': 202,  # Accepted but not completed
                 'body': {
@@ -696,7 +775,7 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                     'project_id': project_id,
                     'project_arn': project_arn,
                     'status': final_status,
-                    'warning': f'Creation did not complete within {max_wait_time} seconds',
+                    'warning': f'Creation did not complete within {elapsed_time} seconds',
                     'next_steps': [
                         'Check SageMaker Studio for project status',
                         'Project creation may still be in progress',
@@ -706,7 +785,7 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         
         # SUCCESS: Project creation completed
-        logger.info(f"SUCCESS: MLOps project {project_name} creation completed!")
+        logger.info("SUCCESS: MLOps project %s creation completed!", project_name)
         
         model_package_group_name = f"{project_name}-{project_id}"
         
@@ -715,14 +794,14 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
         
         try:
             # Get account ID and region for ARN construction
-            account_id = boto3.client('sts').get_caller_identity()['Account']
-            region = boto3.Session().region_name or 'us-east-1'
+            account_id = get_account_id()
+            region = AWS_REGION
             
-            max_wait_time = 600  # 10 minutes to wait for pipeline to create model package group
+            group_max_wait_time = 600  # 10 minutes to wait for pipeline to create model package group
             check_interval = 30  # Check every 30 seconds
-            elapsed_time = 0
+            group_elapsed_time = 0
             
-            while elapsed_time < max_wait_time:
+            while group_elapsed_time < group_max_wait_time:
                 try:
                     # Check if model package group exists
                     sagemaker_client.describe_model_package_group(ModelPackageGroupName=model_package_group_name)
@@ -737,20 +816,20 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                             {'Key': 'ProjectId', 'Value': project_id}
                         ]
                     )
-                    logger.info(f"Successfully tagged model package group: {model_package_group_name}")
+                    logger.info("Successfully tagged model package group: %s", model_package_group_name)
                     break
                     
                 except sagemaker_client.exceptions.ResourceNotFound:
                     # Group doesn't exist yet, keep waiting
-                    logger.info(f"Model package group not created yet, waiting... (elapsed: {elapsed_time}s)")
+                    logger.info("Model package group not created yet, waiting... (elapsed: %ss)", group_elapsed_time)
                     time.sleep(check_interval)
-                    elapsed_time += check_interval
+                    group_elapsed_time += check_interval
                     
-            if elapsed_time >= max_wait_time:
-                logger.warning(f"Model package group {model_package_group_name} was not created within {max_wait_time} seconds")
+            if group_elapsed_time >= group_max_wait_time:
+                logger.warning("Model package group %s was not created within %s seconds", model_package_group_name, group_max_wait_time)
                 
         except Exception as e:
-            logger.warning(f"Failed to tag model package group: {e}")
+            logger.warning("Failed to tag model package group: %s", e)
         
         return {
             'statusCode': 200,
@@ -784,7 +863,7 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Error creating MLOps project: {str(e)}", exc_info=True)
+        logger.error("Error creating MLOps project: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         
         error_message = str(e)
         if 'AccessDenied' in error_message:
@@ -795,7 +874,7 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                     'message': 'Insufficient permissions for SageMaker project creation'
                 }
             }
-        elif 'already exists' in error_message.lower():
+        elif ALREADY_EXISTS_PATTERN.search(error_message):
             return {
                 'statusCode': 409,
                 'body': {
@@ -810,15 +889,62 @@ def create_mlops_project(params: Dict[str, Any]) -> Dict[str, Any]:
                 'body': f'Failed to create MLOps project: {error_message}'
             }
 
+# CodeBuild buildspec for the model build pipeline; {{NAME}} placeholders are filled per call
+CODEBUILD_BUILDSPEC_TEMPLATE = r"""
+version: 0.2
+phases:
+  install:
+    runtime-versions:
+      python: 3.10
+    commands:
+      - pip install --upgrade --force-reinstall . "awscli>1.20.30"
+      - pip install mlflow==2.13.2 sagemaker-mlflow s3fs xgboost
+    
+  build:
+    commands:
+      - export SAGEMAKER_USER_CONFIG_OVERRIDE="./config.yaml"
+      - export PYTHONUNBUFFERED=TRUE
+      - export SAGEMAKER_PROJECT_NAME_ID="${SAGEMAKER_PROJECT_NAME}-${SAGEMAKER_PROJECT_ID}"
+      - |
+        run-pipeline \
+          --role-arn $SAGEMAKER_PIPELINE_ROLE_ARN \
+          --tags "[{\"Key\":\"sagemaker:project-name\",\"Value\":\"${SAGEMAKER_PROJECT_NAME}\"}, {\"Key\":\"sagemaker:project-id\", \"Value\":\"${SAGEMAKER_PROJECT_ID}\"}, {\"Key\":\"project\", \"Value\":\"mlopsagent\"}, {\"Key\":\"CreatedBy\", \"Value\":\"MLOpsAgent\"}]" \
+          --pipeline-name "{{PIPELINE_NAME}}" \
+          --kwargs "{ \
+                \"region\":\"{{REGION}}\", \
+                \"feature_group_name\":\"{{FEATURE_GROUP_NAME}}\",\
+                \"bucket_name\":\"{{BUCKET_NAME}}\",\
+                \"bucket_prefix\":\"{{BUCKET_PREFIX}}\",\
+                \"experiment_name\":\"{{EXPERIMENT_NAME}}\", \
+                \"train_instance_type\":\"{{TRAIN_INSTANCE_TYPE}}\", \
+                \"test_score_threshold\":\"{{TEST_SCORE_THRESHOLD}}\",\
+                \"model_package_group_name\":\"{{MODEL_PACKAGE_GROUP_NAME}}\",\
+                \"model_approval_status\":\"{{MODEL_APPROVAL_STATUS}}\",\
+                \"mlflow_tracking_server_arn\":\"{{MLFLOW_TRACKING_SERVER_ARN}}\"\
+                    }"
+      - echo "Create/update of the SageMaker Pipeline and a pipeline execution completed."
+"""
+
+BUILDSPEC_PLACEHOLDER_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+CICD_PIPELINE_REQUIRED_PARAMS = (
+    'project_name',
+    'model_build_code_repository_full_name',
+    'code_connection_arn',
+    'feature_group_name',
+    'bucket_name',
+    'mlflow_tracking_server_arn',
+    'pipeline_name'
+)
+
 # Use complex GitHub repository downloading and pipeline building from main file
 def build_cicd_pipeline(params: Dict[str, Any]) -> Dict[str, Any]:
     """Build CI/CD pipeline using seed code from GitHub (using urllib instead of requests)"""
-    logger.info(f"build_cicd_pipeline called with params: {params}")
+    logger.info("build_cicd_pipeline called with params: %s", params)
     
     # Required parameters from previous actions
     project_name = params.get('project_name')
     model_build_code_repository_full_name = params.get('model_build_code_repository_full_name')
-    code_connection_arn = params.get('code_connection_arn')
     
     # Additional required parameters
     feature_group_name = params.get('feature_group_name')
@@ -835,18 +961,11 @@ def build_cicd_pipeline(params: Dict[str, Any]) -> Dict[str, Any]:
     model_approval_status = params.get('model_approval_status', 'Approved')
     
     # Validate required parameters
-    missing_params = []
-    if not project_name: missing_params.append('project_name')
-    if not model_build_code_repository_full_name: missing_params.append('model_build_code_repository_full_name')
-    if not code_connection_arn: missing_params.append('code_connection_arn')
-    if not feature_group_name: missing_params.append('feature_group_name')
-    if not bucket_name: missing_params.append('bucket_name')
-    if not mlflow_tracking_server_arn: missing_params.append('mlflow_tracking_server_arn')
-    if not pipeline_name: missing_params.append('pipeline_name')
+    missing_params = [key for key in CICD_PIPELINE_REQUIRED_PARAMS if not params.get(key)]
     
     if missing_params:
         error_msg = f'Missing required parameters: {missing_params}. Please provide these values.'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': {
@@ -858,10 +977,8 @@ def build_cicd_pipeline(params: Dict[str, Any]) -> Dict[str, Any]:
     
     try:
         # Phase 1: Get project details
-        logger.info("Phase 1: Getting project details...")
-        project_response = sagemaker_client.describe_project(ProjectName=project_name)
-        project_id = project_response['ProjectId']
-        project_arn = project_response['ProjectArn']
+        logger.debug("Phase 1: Getting project details...")
+        project_id, project_arn = get_project_ids(project_name)
         
         # Derive additional variables
         repository_name = model_build_code_repository_full_name.split('/')[1]
@@ -870,105 +987,31 @@ def build_cicd_pipeline(params: Dict[str, Any]) -> Dict[str, Any]:
         project_path = f'{git_folder}/{project_folder}'
         model_package_group_name = f"{project_name}-{project_id}"
         
-        logger.info(f"Project details: ID={project_id}, Path={project_path}")
-        
-        # Phase 2: Setup temporary directories
-        logger.info("Phase 2: Setting up temporary directories...")
-        temp_dir = tempfile.mkdtemp()
-        home_dir = temp_dir
-        agent_folder = "mlops-sagemaker-mlflow"
-        
-        os.makedirs(f"{home_dir}/{project_path}", exist_ok=True)
-        os.makedirs(f"{home_dir}/{agent_folder}/pipelines", exist_ok=True)
-        
-        logger.info(f"Temporary directories created in: {temp_dir}")
-        
-        # Phase 3: Setup basic configuration
-        logger.info("Phase 3: Setting up basic configuration...")
-        
-        requirements_content = """sagemaker
-mlflow==2.13.2
-sagemaker-mlflow
-s3fs
-xgboost
-"""
-        
-        config_content = """# SageMaker configuration
-# Add your configuration here
-"""
-        
-        target_dir = f"{home_dir}/{project_path}"
-        os.makedirs(target_dir, exist_ok=True)
-        
-        with open(f"{target_dir}/requirements.txt", 'w') as f:
-            f.write(requirements_content)
-        
-        with open(f"{target_dir}/config.yaml", 'w') as f:
-            f.write(config_content)
-        
-        logger.info("Basic configuration completed")
-        
-        # Phase 4: Generate and save buildspec
-        logger.info("Phase 4: Generating buildspec file...")
-        logger.info("Phase 5: Generating buildspec file...")
-        
-        code_build_buildspec_template = r"""
-version: 0.2
-phases:
-  install:
-    runtime-versions:
-      python: 3.10
-    commands:
-      - pip install --upgrade --force-reinstall . "awscli>1.20.30"
-      - pip install mlflow==2.13.2 sagemaker-mlflow s3fs xgboost
-    
-  build:
-    commands:
-      - export SAGEMAKER_USER_CONFIG_OVERRIDE="./config.yaml"
-      - export PYTHONUNBUFFERED=TRUE
-      - export SAGEMAKER_PROJECT_NAME_ID="${SAGEMAKER_PROJECT_NAME}-${SAGEMAKER_PROJECT_ID}"
-      - |
-        run-pipeline \
-          --role-arn $SAGEMAKER_PIPELINE_ROLE_ARN \
-          --tags "[{\"Key\":\"sagemaker:project-name\",\"Value\":\"${SAGEMAKER_PROJECT_NAME}\"}, {\"Key\":\"sagemaker:project-id\", \"Value\":\"${SAGEMAKER_PROJECT_ID}\"}, {\"Key\":\"project\", \"Value\":\"mlopsagent\"}, {\"Key\":\"CreatedBy\", \"Value\":\"MLOpsAgent\"}]" \
-          --pipeline-name "{{PIPELINE_NAME}}" \
-          --kwargs "{ \
-                \"region\":\"{{REGION}}\", \
-                \"feature_group_name\":\"{{FEATURE_GROUP_NAME}}\",\
-                \"bucket_name\":\"{{BUCKET_NAME}}\",\
-                \"bucket_prefix\":\"{{BUCKET_PREFIX}}\",\
-                \"experiment_name\":\"{{EXPERIMENT_NAME}}\", \
-                \"train_instance_type\":\"{{TRAIN_INSTANCE_TYPE}}\", \
-                \"test_score_threshold\":\"{{TEST_SCORE_THRESHOLD}}\",\
-                \"model_package_group_name\":\"{{MODEL_PACKAGE_GROUP_NAME}}\",\
-                \"model_approval_status\":\"{{MODEL_APPROVAL_STATUS}}\",\
-                \"mlflow_tracking_server_arn\":\"{{MLFLOW_TRACKING_SERVER_ARN}}\"\
-                    }"
-      - echo "Create/update of the SageMaker Pipeline and a pipeline execution completed."
-"""
+        logger.debug("Project details: ID=%s, Path=%s", project_id, project_path)
+        
+        # Phase 2: Render buildspec
+        logger.debug("Phase 2: Generating buildspec file...")
+        
+        # Replace template variables in a single pass
+        buildspec_values = {
+            'REGION': region,
+            'PIPELINE_NAME': pipeline_name,
+            'FEATURE_GROUP_NAME': feature_group_name,
+            'BUCKET_NAME': bucket_name,
+            'BUCKET_PREFIX': bucket_prefix,
+            'EXPERIMENT_NAME': experiment_name,
+            'TRAIN_INSTANCE_TYPE': train_instance_type,
+            'TEST_SCORE_THRESHOLD': str(test_score_threshold),
+            'MODEL_PACKAGE_GROUP_NAME': model_package_group_name,
+            'MODEL_APPROVAL_STATUS': model_approval_status,
+            'MLFLOW_TRACKING_SERVER_ARN': mlflow_tracking_server_arn
+        }
+        code_build_buildspec = BUILDSPEC_PLACEHOLDER_PATTERN.sub(
+            lambda match: buildspec_values[match.group(1)],
+            CODEBUILD_BUILDSPEC_TEMPLATE
+        )
         
-        # Replace template variables
-        code_build_buildspec = code_build_buildspec_template.replace("{{REGION}}", region)
-        code_build_buildspec = code_build_buildspec.replace("{{PIPELINE_NAME}}", pipeline_name)
-        code_build_buildspec = code_build_buildspec.replace("{{FEATURE_GROUP_NAME}}", feature_group_name)
-        code_build_buildspec = code_build_buildspec.replace("{{BUCKET_NAME}}", bucket_name)
-        code_build_buildspec = code_build_buildspec.replace("{{BUCKET_PREFIX}}", bucket_prefix)
-        code_build_buildspec = code_build_buildspec.replace("{{EXPERIMENT_NAME}}", experiment_name)
-        code_build_buildspec = code_build_buildspec.replace("{{TRAIN_INSTANCE_TYPE}}", train_instance_type)
-        code_build_buildspec = code_build_buildspec.replace("{{TEST_SCORE_THRESHOLD}}", str(test_score_threshold))
-        code_build_buildspec = code_build_buildspec.replace("{{MODEL_PACKAGE_GROUP_NAME}}", model_package_group_name)
-        code_build_buildspec = code_build_buildspec.replace("{{MODEL_APPROVAL_STATUS}}", model_approval_status)
-        code_build_buildspec = code_build_buildspec.replace("{{MLFLOW_TRACKING_SERVER_ARN}}", mlflow_tracking_server_arn)
-        
-        # Save buildspec file
-        buildspec_path = f"{home_dir}/{project_path}/codebuild-buildspec.yml"
-        with open(buildspec_path, "w") as f:
-            f.write(code_build_buildspec)
-        
-        logger.info("Buildspec file generated and saved")
-
-        # Cleanup temporary directory
-        shutil.rmtree(temp_dir)
+        logger.info("Generated buildspec for project %s (%s) at %s", project_name, project_id, project_path)
         
         return {
             'statusCode': 200,
@@ -993,15 +1036,19 @@ phases:
                 },
                 'git_operations': {
                     'repository_downloaded': False,
-                    'files_processed': True,
+                    'files_processed': False,
                     'buildspec_generated': True,
                     'method': 'Basic configuration setup'
+                },
+                'buildspec': {
+                    'path': f"{project_path}/codebuild-buildspec.yml",
+                    'content': code_build_buildspec
                 }
             }
         }
         
     except Exception as e:
-        logger.error(f"Error building CI/CD pipeline: {str(e)}", exc_info=True)
+        logger.error("Error building CI/CD pipeline: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': {
@@ -1011,40 +1058,59 @@ phases:
             }
         }
 
+# Model Registry approval status set by each manage_model_approval action
+MODEL_APPROVAL_STATUSES = {'approve': 'Approved', 'reject': 'Rejected'}
+
 # Use complex multi-method approval system from main file
 def manage_model_approval(params: Dict[str, Any]) -> Dict[str, Any]:
     """Manage model approval in SageMaker Model Registry"""
-    logger.info(f"manage_model_approval called with params: {params}")
+    logger.info("manage_model_approval called with params: %s", params)
     
     model_package_arn = params.get('model_package_arn')
     model_package_group_name = params.get('model_package_group_name')
     action = params.get('action', 'approve')
     approval_description = params.get('approval_description', 'Approved by MLOps Agent')
     
-    logger.info(f"Received parameters: {list(params.keys())}")
-    logger.info(f"model_package_group_name: {model_package_group_name}")
-    logger.info(f"model_package_arn: {model_package_arn}")
+    logger.info("Received parameters: %s", list(params.keys()))
+    logger.info("model_package_group_name: %s", model_package_group_name)
+    logger.info("model_package_arn: %s", model_package_arn)
+    
+    # Reject unknown actions before spending SageMaker calls on resolving the model
+    if action not in MODEL_APPROVAL_STATUSES:
+        return {
+            'statusCode': 400,
+            'body': f'Unsupported action: {action}. Supported actions: approve, reject'
+        }
     
     # Auto-resolve model package ARN if only group name provided
     if not model_package_arn and model_package_group_name:
         try:
-            logger.info(f"Attempting to resolve ARN for model package group: {model_package_group_name}")
+            logger.info("Attempting to resolve ARN for model package group: %s", model_package_group_name)
+            latest_model_query = {
+                'ModelPackageGroupName': model_package_group_name,
+                'SortBy': 'CreationTime',
+                'SortOrder': 'Descending',
+                'MaxResults': 1
+            }
+            
+            # Prefer the newest model still awaiting approval, then fall back to the newest of any status
             response = sagemaker_client.list_model_packages(
-                ModelPackageGroupName=model_package_group_name,
-                SortBy='CreationTime',
-                SortOrder='Descending',
-                MaxResults=1
+                ModelApprovalStatus='PendingManualApproval',
+                **latest_model_query
             )
-            
             models = response.get('ModelPackageSummaryList', [])
-            logger.info(f"Found {len(models)} models in group {model_package_group_name}")
+            if not models:
+                response = sagemaker_client.list_model_packages(**latest_model_query)
+                models = response.get('ModelPackageSummaryList', [])
+            
+            logger.info("Found %s models in group %s", len(models), model_package_group_name)
             
             if models:
                 model_package_arn = models[0]['ModelPackageArn']
                 model_status = models[0].get('ModelApprovalStatus', 'Unknown')
-                logger.info(f"Auto-resolved model package ARN: {model_package_arn} (status: {model_status})")
+                logger.info("Auto-resolved model package ARN: %s (status: %s)", model_package_arn, model_status)
             else:
-                logger.error(f"No models found in model package group: {model_package_group_name}")
+                logger.error("No models found in model package group: %s", model_package_group_name)
                 return {
                     'statusCode': 404,
                     'body': {
@@ -1053,7 +1119,7 @@ def manage_model_approval(params: Dict[str, Any]) -> Dict[str, Any]:
                     }
                 }
         except Exception as e:
-            logger.error(f"Failed to resolve model package ARN: {e}")
+            logger.error("Failed to resolve model package ARN: %s", e)
             return {
                 'statusCode': 500,
                 'body': {
@@ -1073,48 +1139,25 @@ def manage_model_approval(params: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     try:
-        if action == 'approve':
-            response = sagemaker_client.update_model_package(
-                ModelPackageArn=model_package_arn,
-                ModelApprovalStatus='Approved',
-                ApprovalDescription=approval_description
-            )
-            
-            return {
-                'statusCode': 200,
-                'body': {
-                    'message': f'Successfully approved model package',
-                    'model_package_arn': model_package_arn,
-                    'approval_status': 'Approved',
-                    'approval_description': approval_description
-                }
-            }
-        
-        elif action == 'reject':
-            response = sagemaker_client.update_model_package(
-                ModelPackageArn=model_package_arn,
-                ModelApprovalStatus='Rejected',
-                ApprovalDescription=approval_description
-            )
-            
-            return {
-                'statusCode': 200,
-                'body': {
-                    'message': f'Successfully rejected model package',
-                    'model_package_arn': model_package_arn,
-                    'approval_status': 'Rejected',
-                    'approval_description': approval_description
-                }
-            }
+        approval_status = MODEL_APPROVAL_STATUSES[action]
+        sagemaker_client.update_model_package(
+            ModelPackageArn=model_package_arn,
+            ModelApprovalStatus=approval_status,
+            ApprovalDescription=approval_description
+        )
         
-        else:
-            return {
-                'statusCode': 400,
-                'body': f'Unsupported action: {action}. Supported actions: approve, reject'
+        return {
+            'statusCode': 200,
+            'body': {
+                'message': f'Successfully {approval_status.lower()} model package',
+                'model_package_arn': model_package_arn,
+                'approval_status': approval_status,
+                'approval_description': approval_description
             }
+        }
     
     except Exception as e:
-        logger.error(f"Error managing model approval: {str(e)}", exc_info=True)
+        logger.error("Error managing model approval: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': {
@@ -1123,9 +1166,49 @@ def manage_model_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
 
+# Polls GetPipelineState until an approval action is waiting, since the deploy pipeline
+# usually reaches the approval stage some time after the model is registered. ActionState
+# carries no action type, so a pending approval is an InProgress execution with a token.
+PIPELINE_APPROVAL_WAITER_MODEL = WaiterModel({
+    'version': 2,
+    'waiters': {
+        'PipelineApprovalPending': {
+            'operation': 'GetPipelineState',
+            'delay': 5,
+            'maxAttempts': 6,
+            'acceptors': [
+                {
+                    'state': 'success',
+                    'matcher': 'path',
+                    'argument': "length(stageStates[].actionStates[?latestExecution.token && latestExecution.status == 'InProgress'][]) > `0`",
+                    'expected': True
+                },
+                {'state': 'failure', 'matcher': 'error', 'expected': 'PipelineNotFoundException'}
+            ]
+        }
+    }
+})
+
+def iter_approval_actions(pipeline_state):
+    """Yield (stage_name, action_name, latest_execution) for each manual approval action in a pipeline state"""
+    for stage in pipeline_state.get('stageStates', []):
+        for action in stage.get('actionStates', []):
+            # Only approval executions carry a token; ActionState has no action type to check
+            latest_execution = action.get('latestExecution') or {}
+            if latest_execution.get('token'):
+                yield stage['stageName'], action['actionName'], latest_execution
+
+# Upper bound on approval_wait_attempts: 24 polls 5 seconds apart wait at most 2 minutes
+MAX_APPROVAL_WAIT_ATTEMPTS = 24
+
+@lru_cache(maxsize=8)
+def get_pipeline_approval_waiter(region):
+    """Return the PipelineApprovalPending waiter for a region's CodePipeline client"""
+    return create_waiter_with_client('PipelineApprovalPending', PIPELINE_APPROVAL_WAITER_MODEL, get_codepipeline_client(region))
+
 def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
     """Direct approach to CodePipeline approval using multiple methods"""
-    logger.info(f"manage_staging_approval called with params: {params}")
+    logger.info("manage_staging_approval called with params: %s", params)
     
     # Required parameters
     project_name = params.get('project_name')
@@ -1143,21 +1226,34 @@ def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
     
+    try:
+        approval_wait_attempts = int(params.get('approval_wait_attempts', 6))
+    except (TypeError, ValueError):
+        return {
+            'statusCode': 400,
+            'body': {
+                'error': 'Invalid parameter: approval_wait_attempts',
+                'message': f'approval_wait_attempts must be an integer between 0 and {MAX_APPROVAL_WAIT_ATTEMPTS}'
+            }
+        }
+    
+    # Keep the wait within the agent's timeout
+    approval_wait_attempts = min(max(approval_wait_attempts, 0), MAX_APPROVAL_WAIT_ATTEMPTS)
+    
     try:
         # Get project details
-        project_response = sagemaker_client.describe_project(ProjectName=project_name)
-        project_id = project_response['ProjectId']
+        project_id, _ = get_project_ids(project_name)
         
-        # Initialize CodePipeline client
-        codepipeline_client = boto3.client('codepipeline', region_name=region)
+        # Get the (cached) CodePipeline client for the pipeline's region
+        codepipeline_client = get_codepipeline_client(region)
         
         # Find the deploy pipeline
         deploy_pipeline_name = f"sagemaker-{project_name}-{project_id}-modeldeploy"
         
-        logger.info(f"Working with pipeline: {deploy_pipeline_name}")
+        logger.info("Working with pipeline: %s", deploy_pipeline_name)
         
         if action == 'approve':
-            logger.info(f"AGGRESSIVE APPROVAL ATTEMPT for {deploy_pipeline_name}")
+            logger.info("AGGRESSIVE APPROVAL ATTEMPT for %s", deploy_pipeline_name)
             
             approved_actions = []
             all_attempts = []
@@ -1165,67 +1261,65 @@ def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             # Method 1: Try pipeline state approach
             try:
                 logger.info("Method 1: Pipeline State Approach")
+                if approval_wait_attempts > 0:
+                    try:
+                        get_pipeline_approval_waiter(region).wait(
+                            name=deploy_pipeline_name,
+                            WaiterConfig={'Delay': 5, 'MaxAttempts': approval_wait_attempts}
+                        )
+                    except WaiterError as e:
+                        logger.warning("No pending approval found for %s: %s", deploy_pipeline_name, e)
+                
                 pipeline_state = codepipeline_client.get_pipeline_state(name=deploy_pipeline_name)
                 
-                for stage in pipeline_state.get('stageStates', []):
-                    stage_name = stage['stageName']
-                    logger.info(f"Checking stage: {stage_name}")
+                for stage_name, action_name, latest_execution in iter_approval_actions(pipeline_state):
+                    status = latest_execution.get('status', 'Unknown')
+                    token = latest_execution.get('token', '')
                     
-                    for action in stage.get('actionStates', []):
-                        action_name = action['actionName']
-                        action_type = action.get('actionTypeId', {})
-                        latest_execution = action.get('latestExecution', {})
-                        
-                        if action_type.get('category') == 'Approval':
-                            status = latest_execution.get('status', 'Unknown')
-                            token = latest_execution.get('token', '')
+                    attempt_info = {
+                        'method': 'pipeline_state',
+                        'stage_name': stage_name,
+                        'action_name': action_name,
+                        'status': status,
+                        'has_token': bool(token),
+                        'token_length': len(token) if token else 0
+                    }
+                    all_attempts.append(attempt_info)
+                    
+                    logger.info("Found approval: %s, Status: %s, Token: %s", action_name, status, 'Yes' if token else 'No')
+                    
+                    if status == 'InProgress' and token:
+                        try:
+                            logger.info("Attempting approval with pipeline state token...")
+                            
+                            codepipeline_client.put_approval_result(
+                                pipelineName=deploy_pipeline_name,
+                                stageName=stage_name,
+                                actionName=action_name,
+                                result={
+                                    'summary': f'Approved via MLOps Agent - Method 1',
+                                    'status': 'Approved'
+                                },
+                                token=token
+                            )
                             
-                            attempt_info = {
+                            approved_actions.append({
                                 'method': 'pipeline_state',
                                 'stage_name': stage_name,
                                 'action_name': action_name,
-                                'status': status,
-                                'has_token': bool(token),
-                                'token_length': len(token) if token else 0
-                            }
-                            all_attempts.append(attempt_info)
-                            
-                            logger.info(f"Found approval: {action_name}, Status: {status}, Token: {'Yes' if token else 'No'}")
+                                'success': True
+                            })
                             
-                            if status == 'InProgress' and token:
-                                try:
-                                    logger.info(f"Attempting approval with pipeline state token...")
-                                    
-                                    codepipeline_client.put_approval_result(
-                                        pipelineName=deploy_pipeline_name,
-                                        stageName=stage_name,
-                                        actionName=action_name,
-                                        result={
-                                            'summary': f'Approved via MLOps Agent - Method 1',
-                                            'status': 'Approved'
-                                        },
-                                        token=token
-                                    )
-                                    
-                                    approved_actions.append({
-                                        'method': 'pipeline_state',
-                                        'stage_name': stage_name,
-                                        'action_name': action_name,
-                                        'success': True
-                                    })
-                                    
-                                    logger.info(f"SUCCESS: Method 1 approved {action_name}")
-                                    
-                                except Exception as e:
-                                    logger.error(f"Method 1 failed: {e}")
-                                    attempt_info['error'] = str(e)
+                            logger.info("SUCCESS: Method 1 approved %s", action_name)
+                            # A deploy pipeline has a single pending approval, so stop scanning
+                            break
                             
-                            elif status == 'InProgress' and not token:
-                                logger.warning(f"Action {action_name} is InProgress but no token available")
-                                attempt_info['issue'] = 'No token available'
+                        except Exception as e:
+                            logger.error("Method 1 failed: %s", e)
+                            attempt_info['error'] = str(e)
                 
             except Exception as e:
-                logger.error(f"Method 1 (pipeline state) failed: {e}")
+                logger.error("Method 1 (pipeline state) failed: %s", e)
                 all_attempts.append({'method': 'pipeline_state', 'error': str(e)})
             
             # Return results
@@ -1261,18 +1355,16 @@ def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             # For 'list' action, return the existing logic
             pipeline_state = codepipeline_client.get_pipeline_state(name=deploy_pipeline_name)
             
-            pending_approvals = []
-            for stage in pipeline_state.get('stageStates', []):
-                for action in stage.get('actionStates', []):
-                    if action.get('actionTypeId', {}).get('category') == 'Approval':
-                        latest_execution = action.get('latestExecution', {})
-                        if latest_execution.get('status') == 'InProgress':
-                            pending_approvals.append({
-                                'stage_name': stage['stageName'],
-                                'action_name': action['actionName'],
-                                'status': latest_execution.get('status'),
-                                'has_token': bool(latest_execution.get('token'))
-                            })
+            pending_approvals = [
+                {
+                    'stage_name': stage_name,
+                    'action_name': action_name,
+                    'status': 'InProgress',
+                    'has_token': bool(latest_execution.get('token'))
+                }
+                for stage_name, action_name, latest_execution in iter_approval_actions(pipeline_state)
+                if latest_execution.get('status') == 'InProgress'
+            ]
             
             return {
                 'statusCode': 200,
@@ -1287,7 +1379,7 @@ def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             }
     
     except Exception as e:
-        logger.error(f"Error in manage_staging_approval: {str(e)}", exc_info=True)
+        logger.error("Error in manage_staging_approval: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': {
@@ -1296,10 +1388,12 @@ def manage_staging_approval(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
 
+FEATURE_GROUP_TAGS = STANDARD_TAGS + [{'Key': 'Purpose', 'Value': 'FeatureStore'}]
+
 # Keep remaining functions unchanged from backup
 def create_feature_store_group(params: Dict[str, Any]) -> Dict[str, Any]:
     """Create SageMaker Feature Store Feature Group with online store only"""
-    logger.info(f"create_feature_store_group called with params: {params}")
+    logger.info("create_feature_store_group called with params: %s", params)
     
     feature_group_name = params.get('feature_group_name')
     description = params.get('description', f'Feature group created by MLOps Agent')
@@ -1307,7 +1401,7 @@ def create_feature_store_group(params: Dict[str, Any]) -> Dict[str, Any]:
     
     if not feature_group_name:
         error_msg = f'Missing required parameter: feature_group_name. Available params: {list(params.keys())}'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': error_msg
@@ -1317,7 +1411,7 @@ def create_feature_store_group(params: Dict[str, Any]) -> Dict[str, Any]:
         # Parse feature descriptions from natural language
         record_identifier_name, event_time_feature_name, feature_definitions = parse_feature_descriptions(feature_description)
         
-        logger.info(f"Parsed {len(feature_definitions)} features from description")
+        logger.info("Parsed %s features from description", len(feature_definitions))
         
         # Create Feature Group with ONLINE STORE ONLY
         response = sagemaker_client.create_feature_group(
@@ -1329,16 +1423,7 @@ def create_feature_store_group(params: Dict[str, Any]) -> Dict[str, Any]:
                 'EnableOnlineStore': True
             },
             Description=description,
-            Tags=[
-                {
-                    'Key': 'CreatedBy',
-                    'Value': 'MLOpsAgent'
-                },
-                {
-                    'Key': 'Purpose',
-                    'Value': 'FeatureStore'
-                }
-            ]
+            Tags=FEATURE_GROUP_TAGS
         )
         
         feature_group_arn = response['FeatureGroupArn']
@@ -1356,21 +1441,44 @@ def create_feature_store_group(params: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Error creating Feature Group: {str(e)}", exc_info=True)
+        logger.error("Error creating Feature Group: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': f'Failed to create Feature Group: {str(e)}'
         }
 
+# Patterns for parse_feature_descriptions, compiled once per container
+RECORD_IDENTIFIER_PATTERNS = (
+    re.compile(r'(\w+)\s+as\s+(?:string\s+)?identifier'),
+    re.compile(r'(\w+)\s+as\s+(?:the\s+)?(?:record\s+)?(?:id|identifier)')
+)
+
+EVENT_TIME_PATTERNS = (
+    re.compile(r'(\w+)\s+as\s+(?:the\s+)?event\s+time'),
+    re.compile(r'event\s+time\s+feature[:\s]+(\w+)')
+)
+
+# "<name> as <type>" and "<name> feature(s) as <type>" in a single scan
+FEATURE_PATTERN = re.compile(r'(\w+)\s+(?:features?\s+)?as\s+(\w+)')
+
+FEATURE_TYPE_MAPPINGS = {
+    'string': 'String', 'integer': 'Integral', 'number': 'Fractional',
+    'float': 'Fractional', 'binary': 'Fractional'
+}
+
+# Concrete dataset columns that features containing these keywords expand to (checked in order)
+FEATURE_EXPANSIONS = {
+    'time_of_day': ('begin_session_time_of_day_mean_last_day_1', 'end_session_time_of_day_mean_last_day_1'),
+    'cohort_id': ('cohort_id_2024_09_11', 'cohort_id_2024_09_12')
+}
+
 def parse_feature_descriptions(description_text):
     """Parse natural language feature descriptions into SageMaker feature definitions"""
-    logger.info(f"Parsing feature description: {description_text}")
+    logger.info("Parsing feature description: %s", description_text)
     
     # Default values
     record_identifier = 'record_id'
     event_time_feature = 'event_time'
-    feature_definitions = []
-    feature_names_seen = set()
     
     if not description_text:
         return record_identifier, event_time_feature, [
@@ -1381,77 +1489,65 @@ def parse_feature_descriptions(description_text):
     text = description_text.lower()
     
     # Extract record identifier
-    id_patterns = [
-        r'(\w+)\s+as\s+(?:string\s+)?identifier',
-        r'(\w+)\s+as\s+(?:the\s+)?(?:record\s+)?(?:id|identifier)'
-    ]
-    
-    for pattern in id_patterns:
-        match = re.search(pattern, text)
+    for pattern in RECORD_IDENTIFIER_PATTERNS:
+        match = pattern.search(text)
         if match:
             record_identifier = match.group(1)
             break
     
     # Extract event time feature
-    event_time_patterns = [
-        r'(\w+)\s+as\s+(?:the\s+)?event\s+time',
-        r'event\s+time\s+feature[:\s]+(\w+)'
-    ]
-    
-    for pattern in event_time_patterns:
-        match = re.search(pattern, text)
+    for pattern in EVENT_TIME_PATTERNS:
+        match = pattern.search(text)
         if match:
             event_time_feature = match.group(1)
             break
     
-    # Helper function to add feature without duplicates
-    def add_feature(feature_name, feature_type):
-        if feature_name not in feature_names_seen:
-            feature_definitions.append({
-                'FeatureName': feature_name,
-                'FeatureType': feature_type
-            })
-            feature_names_seen.add(feature_name)
-    
-    # Add record identifier and event time
-    add_feature(record_identifier, 'String')
-    add_feature(event_time_feature, 'String')
-    
-    # Type mappings
-    type_mappings = {
-        'string': 'String', 'integer': 'Integral', 'number': 'Fractional',
-        'float': 'Fractional', 'binary': 'Fractional'
-    }
+    # Feature name -> SageMaker type; the first type seen for a name wins and insertion order is kept
+    feature_types = {record_identifier: 'String'}
+    feature_types.setdefault(event_time_feature, 'String')
     
     # Parse features
-    feature_patterns = [
-        r'(\w+)\s+as\s+(\w+)',
-        r'(\w+)\s+features?\s+as\s+(\w+)'
-    ]
+    for match in FEATURE_PATTERN.finditer(text):
+        feature_name, feature_type = match.groups()
+        sagemaker_type = FEATURE_TYPE_MAPPINGS.get(feature_type, 'String')
+        
+        expansion = next(
+            (columns for keyword, columns in FEATURE_EXPANSIONS.items() if keyword in feature_name),
+            (feature_name,)
+        )
+        for name in expansion:
+            feature_types.setdefault(name, sagemaker_type)
     
-    for pattern in feature_patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            feature_name, feature_type = match.groups()
-            sagemaker_type = type_mappings.get(feature_type, 'String')
-            
-            if 'time_of_day' in feature_name:
-                time_features = ['begin_session_time_of_day_mean_last_day_1', 'end_session_time_of_day_mean_last_day_1']
-                for tf in time_features:
-                    add_feature(tf, sagemaker_type)
-            elif 'cohort_id' in feature_name:
-                cohort_features = ['cohort_id_2024_09_11', 'cohort_id_2024_09_12']
-                for cf in cohort_features:
-                    add_feature(cf, sagemaker_type)
-            else:
-                if feature_name not in [record_identifier, event_time_feature]:
-                    add_feature(feature_name, sagemaker_type)
+    feature_definitions = [
+        {'FeatureName': name, 'FeatureType': sagemaker_type}
+        for name, sagemaker_type in feature_types.items()
+    ]
     
     return record_identifier, event_time_feature, feature_definitions
 
+MLFLOW_SERVER_REQUIRED_PARAMS = ('tracking_server_name', 'artifact_store_uri')
+
+# MLflow versions that can be requested explicitly; anything else uses the SageMaker default
+SUPPORTED_MLFLOW_VERSIONS = frozenset({'3.0', '2.16', '2.13'})
+
+MLFLOW_SERVER_TAGS = STANDARD_TAGS + [{'Key': 'Purpose', 'Value': 'MLflowTracking'}]
+
+def find_lambda_role_arn():
+    """Return the IAM role ARN this function runs as, derived from its STS identity"""
+    # Lambda runs as arn:<partition>:sts::<account>:assumed-role/<role-name>/<session>.
+    # The assumed-role ARN drops any IAM path, so roles with a path must be passed as role_arn.
+    _, partition, _, _, account_id, resource = get_caller_identity()['Arn'].split(':', 5)
+    resource_type, _, role_and_session = resource.partition('/')
+    if resource_type != 'assumed-role':
+        return None
+    
+    role_arn = f"arn:{partition}:iam::{account_id}:role/{role_and_session.split('/')[0]}"
+    logger.info("Using Lambda execution role: %s", role_arn)
+    return role_arn
+
 def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
     """Create SageMaker MLflow Tracking Server with comprehensive error handling"""
-    logger.info(f"create_mlflow_server called with params: {params}")
+    logger.info("create_mlflow_server called with params: %s", params)
     
     tracking_server_name = params.get('tracking_server_name')
     artifact_store_uri = params.get('artifact_store_uri')
@@ -1459,13 +1555,10 @@ def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
     role_arn = params.get('role_arn')
     mlflow_version = params.get('mlflow_version')
     
-    if not all([tracking_server_name, artifact_store_uri]):
-        missing_params = []
-        if not tracking_server_name: missing_params.append('tracking_server_name')
-        if not artifact_store_uri: missing_params.append('artifact_store_uri')
-        
+    missing_params = [key for key in MLFLOW_SERVER_REQUIRED_PARAMS if not params.get(key)]
+    if missing_params:
         error_msg = f'Missing required parameters: {missing_params}. Available params: {list(params.keys())}'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': error_msg
@@ -1498,37 +1591,15 @@ def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
                 'body': error_response
             }
         
-        logger.info(f"S3 setup complete: {s3_message}")
+        logger.info("S3 setup complete: %s", s3_message)
         bucket_name = s3_details
         
         # STEP 2: Auto-detect role ARN if not provided
         if not role_arn:
             try:
-                sts_client = boto3.client('sts')
-                caller_identity = sts_client.get_caller_identity()
-                account_id = caller_identity['Account']
-                
-                lambda_context = os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
-                if lambda_context:
-                    function_name = os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
-                    possible_roles = [
-                        f"arn:aws:iam::{account_id}:role/{function_name}-role",
-                        f"arn:aws:iam::{account_id}:role/lambda-execution-role"
-                    ]
-                    
-                    iam_client = boto3.client('iam')
-                    for potential_role in possible_roles:
-                        try:
-                            role_name = potential_role.split('/')[-1]
-                            iam_client.get_role(RoleName=role_name)
-                            role_arn = potential_role
-                            logger.info(f"Found Lambda role: {role_arn}")
-                            break
-                        except iam_client.exceptions.NoSuchEntityException:
-                            continue
-                            
+                role_arn = find_lambda_role_arn()
             except Exception as role_error:
-                logger.error(f"Role auto-detection failed: {str(role_error)[:200]}")
+                logger.error("Role auto-detection failed: %s", str(role_error)[:200])
         
         if not role_arn:
             return {
@@ -1548,25 +1619,16 @@ def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
             'TrackingServerSize': tracking_server_size,
             'RoleArn': role_arn,
             'AutomaticModelRegistration': True,
-            'Tags': [
-                {
-                    'Key': 'CreatedBy',
-                    'Value': 'MLOpsAgent'
-                },
-                {
-                    'Key': 'Purpose',
-                    'Value': 'MLflowTracking'
-                }
-            ]
+            'Tags': MLFLOW_SERVER_TAGS
         }
         
-        if mlflow_version and mlflow_version in ['3.0', '2.16', '2.13']:
+        if mlflow_version in SUPPORTED_MLFLOW_VERSIONS:
             create_params['MlflowVersion'] = mlflow_version
         
         response = sagemaker_client.create_mlflow_tracking_server(**create_params)
         
         tracking_server_arn = response['TrackingServerArn']
-        logger.info(f"MLflow server creation initiated: {tracking_server_arn}")
+        logger.info("MLflow server creation initiated: %s", tracking_server_arn)
         
         return {
             'statusCode': 202,
@@ -1586,7 +1648,7 @@ def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Unexpected error in create_mlflow_server: {str(e)[:200]}", exc_info=True)
+        logger.error("Unexpected error in create_mlflow_server: %s", str(e)[:200], exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': {
@@ -1595,20 +1657,19 @@ def create_mlflow_server(params: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
 
+PROJECT_LIFECYCLE_REQUIRED_PARAMS = ('project_name', 'action')
+
 def manage_project_lifecycle(params: Dict[str, Any]) -> Dict[str, Any]:
     """Handle project updates and lifecycle management"""
-    logger.info(f"manage_project_lifecycle called with params: {params}")
+    logger.info("manage_project_lifecycle called with params: %s", params)
     
     project_name = params.get('project_name')
     action = params.get('action')
     
-    if not all([project_name, action]):
-        missing_params = []
-        if not project_name: missing_params.append('project_name')
-        if not action: missing_params.append('action')
-        
+    missing_params = [key for key in PROJECT_LIFECYCLE_REQUIRED_PARAMS if not params.get(key)]
+    if missing_params:
         error_msg = f'Missing required parameters: {missing_params}. Available params: {list(params.keys())}'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': error_msg
@@ -1617,6 +1678,7 @@ def manage_project_lifecycle(params: Dict[str, Any]) -> Dict[str, Any]:
     try:
         if action == 'describe':
             response = sagemaker_client.describe_project(ProjectName=project_name)
+            remember_project_ids(project_name, response['ProjectId'], response['ProjectArn'])
             return {
                 'statusCode': 200,
                 'body': {
@@ -1624,7 +1686,7 @@ def manage_project_lifecycle(params: Dict[str, Any]) -> Dict[str, Any]:
                     'project_id': response['ProjectId'],
                     'project_arn': response['ProjectArn'],
                     'project_status': response['ProjectStatus'],
-                    'creation_time': response['CreationTime'].isoformat(),
+                    'creation_time': response['CreationTime'].isoformat(timespec='seconds'),
                     'created_by': response.get('CreatedBy', {})
                 }
             }
@@ -1647,54 +1709,58 @@ def manage_project_lifecycle(params: Dict[str, Any]) -> Dict[str, Any]:
             }
             
     except Exception as e:
-        logger.error(f"Error managing project lifecycle: {str(e)}", exc_info=True)
+        logger.error("Error managing project lifecycle: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'statusCode': 500,
             'body': f'Failed to manage project lifecycle: {str(e)}'
         }
 
+# Available templates with the keywords they match
+MLOPS_TEMPLATES = [
+    {
+        'ProductId': 'prod-txwcxmr6k3xsc',
+        'Name': 'MLOps Template for Model Building and Deployment with GitHub',
+        'ShortDescription': 'Template for creating MLOps projects with GitHub integration for CI/CD pipelines',
+        'Owner': 'Amazon SageMaker',
+        'Keywords': ['github', 'build', 'deploy', 'cicd', 'ci/cd', 'integration', 'mlops', 'project']
+    }
+]
+
+# The template list is static, so its response is built once at import (treat as read-only)
+MLOPS_TEMPLATES_RESPONSE = {
+    'statusCode': 200,
+    'body': {
+        'message': f'Found {len(MLOPS_TEMPLATES)} MLOps templates',
+        'templates': [
+            {
+                'ProductId': t['ProductId'],
+                'Name': t['Name'],
+                'ShortDescription': t['ShortDescription'],
+                'Owner': t['Owner']
+            }
+            for t in MLOPS_TEMPLATES
+        ],
+        'usage': f'Use ProductId "{MLOPS_TEMPLATES[0]["ProductId"]}" for MLOps projects with GitHub integration'
+    }
+}
+
 def list_mlops_templates(params: Dict[str, Any]) -> Dict[str, Any]:
     """List available MLOps Service Catalog templates"""
     logger.info("list_mlops_templates called - simplified version")
-    
-    # Define available templates with keywords they match
-    available_templates = [
-        {
-            'ProductId': 'prod-txwcxmr6k3xsc',
-            'Name': 'MLOps Template for Model Building and Deployment with GitHub',
-            'ShortDescription': 'Template for creating MLOps projects with GitHub integration for CI/CD pipelines',
-            'Owner': 'Amazon SageMaker',
-            'Keywords': ['github', 'build', 'deploy', 'cicd', 'ci/cd', 'integration', 'mlops', 'project']
-        }
-    ]
-    
-    return {
-        'statusCode': 200,
-        'body': {
-            'message': f'Found {len(available_templates)} MLOps templates',
-            'templates': [
-                {
-                    'ProductId': t['ProductId'],
-                    'Name': t['Name'],
-                    'ShortDescription': t['ShortDescription'],
-                    'Owner': t['Owner']
-                }
-                for t in available_templates
-            ],
-            'usage': f'Use ProductId "{available_templates[0]["ProductId"]}" for MLOps projects with GitHub integration'
-        }
-    }
+    return MLOPS_TEMPLATES_RESPONSE
+
+MODEL_PACKAGE_GROUP_TAGS = STANDARD_TAGS + [{'Key': 'Purpose', 'Value': 'ModelRegistry'}]
 
 def create_model_group(params: Dict[str, Any]) -> Dict[str, Any]:
     """Create SageMaker Model Package Group (Model Registry)"""
-    logger.info(f"create_model_group called with params: {params}")
+    logger.info("create_model_group called with params: %s", params)
     
     model_package_group_name = params.get('model_package_group_name')
     description = params.get('description', f'Model package group created by MLOps Agent')
     
     if not model_package_group_name:
         error_msg = f'Missing required parameter: model_package_group_name. Available params: {list(params.keys())}'
-        logger.error(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         return {
             'statusCode': 400,
             'body': error_msg
@@ -1705,21 +1771,12 @@ def create_model_group(params: Dict[str, Any]) -> Dict[str, Any]:
         response = sagemaker_client.create_model_package_group(
             ModelPackageGroupName=model_package_group_name,
             ModelPackageGroupDescription=description,
-            Tags=[
-                {
-                    'Key': 'CreatedBy',
-                    'Value': 'MLOpsAgent'
-                },
-                {
-                    'Key': 'Purpose',
-                    'Value': 'ModelRegistry'
-                }
-            ]
+            Tags=MODEL_PACKAGE_GROUP_TAGS
         )
         
         model_package_group_arn = response['ModelPackageGroupArn']
         
-        logger.info(f"Successfully created Model Package Group: {model_package_group_name}")
+        logger.info("Successfully created Model Package Group: %s", model_package_group_name)
         
         return {
             'statusCode': 200,
@@ -1739,10 +1796,10 @@ def create_model_group(params: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Error creating Model Package Group: {str(e)}", exc_info=True)
+        logger.error("Error creating Model Package Group: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         
         error_message = str(e)
-        if 'already exists' in error_message.lower():
+        if ALREADY_EXISTS_PATTERN.search(error_message):
             return {
                 'statusCode': 409,
                 'body': {
@@ -1756,3 +1813,17 @@ def create_model_group(params: Dict[str, Any]) -> Dict[str, Any]:
                 'statusCode': 500,
                 'body': f'Failed to create Model Package Group: {error_message}'
             }
+
+# Bedrock Agent API paths mapped to their action handlers (defined after all handlers)
+API_ROUTES = {
+    '/configure-code-connection': create_code_connection,  # Use backup version
+    '/create-mlops-project': create_mlops_project,
+    '/manage-project-lifecycle': manage_project_lifecycle,
+    '/list-mlops-templates': list_mlops_templates,
+    '/build-cicd-pipeline': build_cicd_pipeline,
+    '/manage-model-approval': manage_model_approval,
+    '/manage-staging-approval': manage_staging_approval,
+    '/create-feature-store-group': create_feature_store_group,
+    '/create-mlflow-server': create_mlflow_server,
+    '/create-model-group': create_model_group
+}
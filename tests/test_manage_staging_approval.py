@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from botocore.stub import Stubber
+
+import lambda_function
+
+PROJECT_NAME = 'churn'
+PROJECT_ID = 'p-abc123'
+PIPELINE_NAME = f'sagemaker-{PROJECT_NAME}-{PROJECT_ID}-modeldeploy'
+REGION = 'us-west-2'
+TOKEN = '0c3b1e5a-1111-2222-3333-444455556666'
+
+# GetPipelineState response in the shape the API returns: ActionState has no actionTypeId
+PIPELINE_STATE = {
+    'pipelineName': PIPELINE_NAME,
+    'stageStates': [
+        {
+            'stageName': 'Source',
+            'actionStates': [
+                {'actionName': 'ModelDeployInfraCode', 'latestExecution': {'status': 'Succeeded'}}
+            ]
+        },
+        {
+            'stageName': 'DeployStaging',
+            'actionStates': [
+                {'actionName': 'DeployResourcesStaging', 'latestExecution': {'status': 'Succeeded'}},
+                {'actionName': 'ApproveDeployment', 'latestExecution': {'status': 'InProgress', 'token': TOKEN}}
+            ]
+        }
+    ]
+}
+
+
+class ManageStagingApprovalTest(unittest.TestCase):
+
+    def setUp(self):
+        lambda_function.remember_project_ids(PROJECT_NAME, PROJECT_ID, f'arn:aws:sagemaker:{REGION}:123456789012:project/{PROJECT_NAME}')
+        self.stubber = Stubber(lambda_function.get_codepipeline_client(REGION))
+        self.stubber.activate()
+
+    def tearDown(self):
+        self.stubber.deactivate()
+        lambda_function._project_id_cache.clear()
+
+    def test_approve_pending_approval(self):
+        # One call for the waiter, one for the scan
+        self.stubber.add_response('get_pipeline_state', PIPELINE_STATE, {'name': PIPELINE_NAME})
+        self.stubber.add_response('get_pipeline_state', PIPELINE_STATE, {'name': PIPELINE_NAME})
+        self.stubber.add_response('put_approval_result', {}, {
+            'pipelineName': PIPELINE_NAME,
+            'stageName': 'DeployStaging',
+            'actionName': 'ApproveDeployment',
+            'result': {'summary': 'Approved via MLOps Agent - Method 1', 'status': 'Approved'},
+            'token': TOKEN
+        })
+
+        result = lambda_function.manage_staging_approval({'project_name': PROJECT_NAME, 'action': 'approve', 'region': REGION})
+
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(result['body']['approved_actions'][0]['action_name'], 'ApproveDeployment')
+        self.stubber.assert_no_pending_responses()
+
+    def test_invalid_approval_wait_attempts(self):
+        result = lambda_function.manage_staging_approval({
+            'project_name': PROJECT_NAME,
+            'action': 'approve',
+            'region': REGION,
+            'approval_wait_attempts': 'abc'
+        })
+
+        self.assertEqual(result['statusCode'], 400)
+        self.stubber.assert_no_pending_responses()
+
+    def test_list_pending_approvals(self):
+        self.stubber.add_response('get_pipeline_state', PIPELINE_STATE, {'name': PIPELINE_NAME})
+
+        result = lambda_function.manage_staging_approval({'project_name': PROJECT_NAME, 'action': 'list', 'region': REGION})
+
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(result['body']['pending_approvals'], [{
+            'stage_name': 'DeployStaging',
+            'action_name': 'ApproveDeployment',
+            'status': 'InProgress',
+            'has_token': True
+        }])
+
+
+if __name__ == '__main__':
+    unittest.main()